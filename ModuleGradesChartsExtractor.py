@@ -1,4 +1,6 @@
+import io
 import os
+import sys
 import time
 import pandas as pd
 from bs4 import BeautifulSoup
@@ -8,11 +10,25 @@ from selenium.webdriver.edge.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.drawing.image import Image as XLImage
-from PIL import Image as PILImage
+
+from module_index import (DEFAULT_MODULE_CODES, DEFAULT_YEAR, DEFAULT_SEMESTER, INDEX_DIR,
+                          GRADES_PAGE, CHART_PAGES, module_base_url, previous_year, load_module_index,
+                          load_or_discover_index, plan_modules, module_has_page)
+from page_probe import (PRESENT, ABSENT, LOGIN, TIMEOUT, probe_page, is_known_absent, record_probe,
+                        clear_probes, merge_probes, save_probes, is_login_page)
+from grade_snapshots import SNAPSHOT_DIR, save_snapshot, load_snapshot, snapshot_to_grades, load_footers
+from grade_summary import summarize_grades, check_against_footer, summaries_to_dataframe, summaries_from_grades
+from student_index import STUDENT_INDEX_PATH, build_student_index, save_student_index, student_sheet
+from local_charts import covered_chart_pages, render_all_charts
+from chart_images import prepare_chart_image, dedupe_workbook_media, ImageStageReport
+from session_keepalive import SessionExpired, SessionHeartbeat, PARKED_DIR, save_parked, load_parked
+from shard_runs import parse_shard, shard_modules, shard_dir, write_shard_output
+from run_progress import RunProgress
 
 
 def setup_driver():
@@ -39,7 +55,7 @@ def manual_login(driver, test_url):
     
     # Verify authentication
     try:
-        if "login" in driver.current_url.lower() or "auth" in driver.current_url.lower():
+        if is_login_page(driver):
             print("Warning: Still appears to be on login page")
             input("Please complete login and press Enter again...")
         print("Authentication verified! Starting data extraction...")
@@ -63,7 +79,7 @@ def parse_html_table_to_dataframe(table_html):
     """Parse HTML table into pandas DataFrame"""
     soup = BeautifulSoup(table_html, "html.parser")
     table = soup.find("table")
-    df = pd.read_html(str(table), header=[0, 1])[0]  # Read MultiIndex headers
+    df = pd.read_html(io.StringIO(str(table)), header=[0, 1])[0]  # Read MultiIndex headers
     return df
 
 
@@ -86,64 +102,92 @@ def filter_grades_dataframe(df, module_code):
     # Convert grades to numeric (ignore non-numeric or missing values)
     student_data['Calc Grade'] = pd.to_numeric(student_data['Calc Grade'], errors='coerce')
 
-    # Calculate extra statistics
-    total_students = student_data['Calc Grade'].count()
-    pct_gte_16_5 = (student_data['Calc Grade'] >= 16.5).sum() / total_students * 100 if total_students > 0 else 0
-    pct_14_16 = ((student_data['Calc Grade'] >= 14) & (student_data['Calc Grade'] < 16)).sum() / total_students * 100 if total_students > 0 else 0
+    # Summary statistics come from the student rows; the MMS footer is only a cross-check
+    footer = dict(zip(summary_data['Matric Number'], summary_data['Calc Grade']))
+    summary_row = summarize_grades(module_code, student_data['Calc Grade'], footer)
+    for mismatch in check_against_footer(summary_row):
+        print(f"  ⚠️ {module_code} footer mismatch - {mismatch}")
+
+    return student_data, summary_row
 
-    # Format summary row from table
-    summary_row = summary_data.set_index('Matric Number').T
-    summary_row.columns.name = None
-    summary_row['Module'] = module_code
 
-    # Add new calculated percentages
-    summary_row['% ≥ 16.5'] = round(pct_gte_16_5, 2)
-    summary_row['% between 14–16'] = round(pct_14_16, 2)
+def extract_module_grades(driver, module_code, base_url=module_base_url(), index=None):
+    """Probe a module's grades page and return (student_data, summary_row)"""
+    if is_known_absent(index, module_code, GRADES_PAGE):
+        raise ValueError("no grades table in earlier run")
+    
+    # No container is known to hold a "no data" note here, so absence is only recorded after the full wait
+    status = probe_page(driver, f"{base_url}/{module_code}/Final+grade/", "#gradesTable")
+    if status == LOGIN:
+        raise SessionExpired("redirected to login")
+    if status == ABSENT:
+        record_probe(index, module_code, GRADES_PAGE, ABSENT)
+        raise ValueError("grades table absent")
+    
+    # A slow page or a failed probe still gets the full wait before it is given up on
+    try:
+        table_html = extract_table_html(driver)
+    except TimeoutException:
+        if status == TIMEOUT:
+            record_probe(index, module_code, GRADES_PAGE, ABSENT)
+        raise ValueError("grades table not found")
+    record_probe(index, module_code, GRADES_PAGE, PRESENT)
+    df = parse_html_table_to_dataframe(table_html)
+    return filter_grades_dataframe(df, module_code)
 
-    summary_row = summary_row.set_index('Module')
 
-    return student_data, summary_row
+# The rendered plot inside the chart container; probed and waited on alike
+CHART_CONTAINER = "#scatterChart"
+CHART_SELECTOR = f"{CHART_CONTAINER} .user-select-none.svg-container"
 
 
-def save_charts_as_png(driver, module_code, charts_dir="charts"):
-    """Save both scatter charts for a module"""
+def save_charts_as_png(driver, module_code, charts_dir="charts", base_url=module_base_url(), index=None,
+                       chart_types=CHART_PAGES):
+    """Save the scatter charts for a module, skipping pages probed as empty"""
     saved_count = 0
     
     # URLs for the two different scatter charts
     urls = {
-        "GraphPage": f"https://mms.st-andrews.ac.uk/mms/module/2024_5/S2/{module_code}/Final+grade/GraphPage",
-        "SubmitResults": f"https://mms.st-andrews.ac.uk/mms/module/2024_5/S2/{module_code}/Final+grade/SubmitResults"
+        "GraphPage": f"{base_url}/{module_code}/Final+grade/GraphPage",
+        "SubmitResults": f"{base_url}/{module_code}/Final+grade/SubmitResults"
     }
+    urls = {chart_type: url for chart_type, url in urls.items() if chart_type in chart_types}
     
     # Create folder for this module
     folder_path = os.path.join(charts_dir, module_code)
     os.makedirs(folder_path, exist_ok=True)
     
     for chart_type, url in urls.items():
+        if is_known_absent(index, module_code, chart_type):
+            print(f"  Skipping {chart_type} for {module_code} (no chart in earlier run)")
+            continue
+        
         try:
             print(f"  Loading {chart_type} chart for {module_code}...")
-            driver.get(url)
-            time.sleep(3)  # Wait for page to load
+            status = probe_page(driver, url, CHART_SELECTOR, CHART_CONTAINER)
             
             # Check if we got redirected to login
-            if "login" in driver.current_url.lower() or "auth" in driver.current_url.lower():
-                print(f"  Session expired! Please re-authenticate.")
-                input("Complete authentication and press Enter...")
-                driver.get(url)
-                time.sleep(5)
+            if status == LOGIN:
+                raise SessionExpired(f"redirected to login on {chart_type}")
+            
+            if status == ABSENT:
+                record_probe(index, module_code, chart_type, ABSENT)
+                print(f"    ✗ No chart on {chart_type} for {module_code}")
+                continue
+            
+            # Scatter chart 1 comes from GraphPage, scatter chart 2 from SubmitResults
+            chart_name = "ScatterChart_1" if chart_type == "GraphPage" else "ScatterChart_2"
             
             # Look for scatter chart
             try:
                 wait = WebDriverWait(driver, 15)
-                
-                if chart_type == "GraphPage":
-                    # Scatter chart 1 from GraphPage
-                    scatter_chart = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#scatterChart .user-select-none.svg-container")))
-                    chart_name = "ScatterChart_1"
-                else:
-                    # Scatter chart 2 from SubmitResults
-                    scatter_chart = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#scatterChart .user-select-none.svg-container")))
-                    chart_name = "ScatterChart_2"
+                try:
+                    scatter_chart = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, CHART_SELECTOR)))
+                except TimeoutException:
+                    if status == TIMEOUT:
+                        record_probe(index, module_code, chart_type, ABSENT)
+                    raise
+                record_probe(index, module_code, chart_type, PRESENT)
                 
                 print(f"    Found {chart_name} for {module_code}")
                 
@@ -164,14 +208,16 @@ def save_charts_as_png(driver, module_code, charts_dir="charts"):
             except Exception as e:
                 print(f"    ✗ {chart_name} not found for {module_code}: {e}")
         
+        except SessionExpired:
+            raise
         except Exception as e:
             print(f"  Error processing {chart_type} for {module_code}: {e}")
     
     return saved_count
 
 
-def add_charts_to_excel(wb, module_code, charts_dir="charts"):
-    """Add charts to the existing module sheet in the workbook"""
+def add_charts_to_excel(wb, module_code, charts_dir="charts", report=None, quantize=True):
+    """Add charts to the existing module sheet in the workbook (256-colour PNGs unless quantize=False)"""
     try:
         # Get the existing sheet for this module
         if module_code in wb.sheetnames:
@@ -205,19 +251,16 @@ def add_charts_to_excel(wb, module_code, charts_dir="charts"):
                     print(f"    ✗ Chart file not found: {chart_path}")
                     continue
                 
-                # Resize image to reasonable size for Excel
-                img = PILImage.open(chart_path)
-                img.thumbnail((800, 600))  # Resize to max dimensions
-                temp_path = chart_path.replace(".png", "_resized.png")
-                img.save(temp_path)
-                
-                # Verify temp file was created
-                if not os.path.exists(temp_path):
-                    print(f"    ✗ Failed to create resized image: {temp_path}")
+                # Resize and optimize image to reasonable size for Excel
+                png_bytes, plain_bytes, error = prepare_chart_image(chart_path, (800, 600), quantize)
+                if error:
+                    print(f"    ✗ Failed to prepare {chart_file}: {error}")
                     continue
+                if report is not None:
+                    report.add(png_bytes, plain_bytes)
                 
                 # Add to Excel sheet
-                xl_img = XLImage(temp_path)
+                xl_img = XLImage(io.BytesIO(png_bytes))
                 cell_location = f"D{current_row}"
                 sheet.add_image(xl_img, cell_location)
                 current_row += 25  # Space between charts
@@ -234,28 +277,107 @@ def add_charts_to_excel(wb, module_code, charts_dir="charts"):
         return False
 
 
-def main():
-    """Main function"""
+def build_workbook(all_grades, summary_df, output_filename, charts_dir="charts",
+                   student_index_path=STUDENT_INDEX_PATH, quantize=True):
+    """Write module, Summary and Students sheets, then embed the charts; returns sheets with charts"""
+    print(f"\n📊 Creating Excel workbook with grades and charts...")
+    
+    with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
+        # Write individual module sheets with grades
+        for module_code, df in all_grades.items():
+            df.to_excel(writer, sheet_name=module_code, index=False)
+        
+        # Write summary sheet
+        if not summary_df.empty:
+            summary_df.to_excel(writer, sheet_name="Summary")
+        
+        # Write cross-module view of every student
+        student_index = build_student_index(all_grades)
+        student_sheet(student_index).to_excel(writer, sheet_name="Students")
+    
+    index_file = save_student_index(student_index, student_index_path)
+    print(f"🗂️ Student index saved: {index_file}")
+    
+    # Add charts to the existing workbook
+    print("📈 Adding charts to Excel sheets...")
+    wb = load_workbook(output_filename)
+    image_report = ImageStageReport()
+    
+    charts_added = 0
+    for module_code in all_grades.keys():
+        if add_charts_to_excel(wb, module_code, charts_dir, image_report, quantize):
+            charts_added += 1
+    
+    wb.save(output_filename)
+    dedupe_workbook_media(output_filename, image_report)
+    print(f"  Images: {image_report.summary()}")
+    return charts_added
+
+
+def main(local_charts=False, shard=None, reprobe=False, year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER,
+         lossless_charts=False, resume=False, rediscover=False):
+    """Main function
+
+    With local_charts=True the charts are drawn from the scraped grades instead of
+    captured from MMS, wherever the data allows it (the previous-year chart needs a
+    stored snapshot of that year).
+
+    With shard=(i, n) only the i-th of n shards of the module plan is processed and
+    everything is written to shards/shard_<i>_of_<n>/; combine the shards with
+    ``python shard_runs.py merge``.
+
+    With reprobe=True pages recorded as empty by earlier runs are checked again, and with
+    rediscover=True the module index is crawled again instead of read from cache/.
+
+    year and semester select the MMS academic year (e.g. 2023_4) and semester (S1/S2);
+    running an earlier year stores the snapshot that year-over-year comparisons need.
+
+    Charts are embedded as 256-colour PNGs; lossless_charts=True keeps them pixel-exact.
+
+    Modules that could not be processed because the MMS session expired are parked and
+    listed in cache/ once the workbook is written; resume=True retries only those and
+    rebuilds the workbook together with the grades stored by the earlier run.
+    """
     print("St Andrews Module Data and Charts Extractor")
+    print(f"Academic year {year}, semester {semester}")
     print("=" * 60)
     
-    # Module codes to process
-    module_codes = ['GG4258', 'GG3281', 'GG1002', 'GG2014', 'GG4248', 'GG4247', 'SS5103',
-                    'GG4254', 'GG4257', 'GG3205', 'GG3213', 'GG3214', 'GG5005', 'GG4399',
-                    'SD4126', 'SD4129', 'SD4133', 'SD1004', 'SD4225', 'SD2006', 'SD2100',
-                    'SD4110', 'SD3102', 'SD3101', 'SD4120', 'SD4125', 'SD4297', 'SD5801',
-                    'SD5802', 'SD5805', 'SD5806', 'SD5807', 'SD5810', 'SD5820', 'SD5821',
-                    'SD5811', 'SD5813', 'SD5812']
+    # Module codes to process (replaced by the discovered index after login)
+    module_codes = list(DEFAULT_MODULE_CODES)
     
-    base_url = "https://mms.st-andrews.ac.uk/mms/module/2024_5/S2"
+    base_url = module_base_url(year, semester)
     output_filename = "Complete_Modules_Data_and_Charts.xlsx"
     charts_dir = "charts"
+    snapshot_dir = SNAPSHOT_DIR
+    student_index_path = STUDENT_INDEX_PATH
+    parked_dir = PARKED_DIR
+    index_dir = INDEX_DIR
+    
+    # A shard keeps all of its output in its own folder
+    if shard:
+        output_dir = shard_dir(*shard)
+        output_filename = os.path.join(output_dir, output_filename)
+        charts_dir = os.path.join(output_dir, charts_dir)
+        snapshot_dir = output_dir
+        student_index_path = os.path.join(output_dir, "student_index.pkl")
+        parked_dir = output_dir
+        index_dir = output_dir  # Probe results too, so shards never overwrite the shared cache
+        print(f"Running shard {shard[0]} of {shard[1]} into {output_dir}")
     
     # Create charts directory
     os.makedirs(charts_dir, exist_ok=True)
     
+    # Previous year's grades, used for the locally rendered comparison charts
+    previous_grades = {}
+    if local_charts:
+        previous_snapshot = load_snapshot(previous_year(year), semester)
+        if previous_snapshot is not None:
+            previous_grades = snapshot_to_grades(previous_snapshot)
+    
     # Setup driver
     driver = setup_driver()
+    heartbeat = None
+    index = None
     all_grades = {}
     all_summaries = []
     
@@ -264,6 +386,34 @@ def main():
         login_url = f"{base_url}/{module_codes[0]}/Final+grade/"
         manual_login(driver, login_url)
         
+        # Keep the session warm in the background while modules are processed
+        heartbeat = SessionHeartbeat(driver)
+        heartbeat.start()
+        
+        # Only schedule modules that have a Final grade page this semester
+        index = load_or_discover_index(driver, year, semester, refresh=rediscover)
+        if reprobe:
+            clear_probes(index)
+            print("🔁 Ignoring recorded probe results, every page is probed again")
+        module_codes = plan_modules(index)
+        if shard:
+            module_codes = shard_modules(module_codes, *shard)
+            merge_probes(index, load_module_index(year, semester, index_dir), module_codes)
+        planned_codes = list(module_codes)
+        
+        # A resumed run only visits the parked modules and rebuilds the output with the stored grades
+        if resume:
+            resumed = load_parked(year, semester, parked_dir)
+            snapshot = load_snapshot(year, semester, snapshot_dir)
+            if not resumed:
+                print("No parked modules to resume, processing the full plan")
+            else:
+                module_codes = [code for code in module_codes if code in resumed]
+                if snapshot is not None:
+                    all_grades = snapshot_to_grades(snapshot)
+                    all_summaries = summaries_from_grades(all_grades, load_footers(year, semester, snapshot_dir))
+                print(f"▶️ Resuming {len(module_codes)} parked modules ({len(all_grades)} modules already collected)")
+        
         print(f"\n🔍 Processing {len(module_codes)} modules...")
         print("=" * 40)
         
@@ -271,67 +421,124 @@ def main():
         total_charts_saved = 0
         successful_modules = 0
         
-        for i, module_code in enumerate(module_codes, 1):
-            print(f"\n[{i}/{len(module_codes)}] Processing module {module_code}...")
+        progress = RunProgress(len(module_codes))
+        parked = []
+        session_lost = False
+        for module_code in module_codes:
+            progress.start_module(module_code)
             
-            # Extract grades data
-            try:
-                module_url = f"{base_url}/{module_code}/Final+grade/"
-                driver.get(module_url)
-                
-                table_html = extract_table_html(driver)
-                df = parse_html_table_to_dataframe(table_html)
-                student_data, summary_row = filter_grades_dataframe(df, module_code)
-                
-                if student_data is not None:
-                    all_grades[module_code] = student_data
-                    all_summaries.append(summary_row)
-                    print(f"  ✅ Grades data collected for {module_code}")
-                else:
-                    print(f"  ⚠️ No grades data for {module_code}")
-                    
-            except Exception as e:
-                print(f"  ⚠️ Error extracting grades for {module_code}: {e}")
+            # Confirm an expiry the heartbeat reports in the browser before parking anything
+            if heartbeat.expired and not session_lost:
+                session_lost = heartbeat.confirm_expired(driver)
+            if session_lost:
+                parked.append(module_code)
+                progress.skip_module()
+                print(f"  ⏸️ Session expired, {module_code} parked")
+                continue
             
-            # Extract charts
-            try:
-                charts_saved = save_charts_as_png(driver, module_code, charts_dir)
-                if charts_saved > 0:
-                    total_charts_saved += charts_saved
-                    successful_modules += 1
-                    print(f"  ✅ {charts_saved} charts saved for {module_code}")
-                else:
-                    print(f"  ⚠️ No charts saved for {module_code}")
-            except Exception as e:
-                print(f"  ⚠️ Error extracting charts for {module_code}: {e}")
+            remaining = heartbeat.seconds_until_expiry()
+            if remaining is not None and 0 < remaining < 300:
+                print(f"  ⏳ MMS session cookies expire in about {remaining / 60:.0f} min")
+            
+            # Extract grades data (kept from the snapshot when a parked module is resumed)
+            if module_code not in all_grades:
+                try:
+                    with progress.stage("grades"):
+                        student_data, summary_row = extract_module_grades(driver, module_code, base_url, index)
+            
+                    if student_data is not None:
+                        all_grades[module_code] = student_data
+                        all_summaries.append(summary_row)
+                        print(f"  ✅ Grades data collected for {module_code}")
+                    else:
+                        print(f"  ⚠️ No grades data for {module_code}")
+            
+                except SessionExpired:
+                    session_lost = True
+                    parked.append(module_code)
+                    progress.skip_module()
+                    print(f"  ⏸️ Session expired, {module_code} parked")
+                    continue
+                except Exception as e:
+                    print(f"  ⚠️ Error extracting grades for {module_code}: {e}")
+            
+            # Extract charts (only the ones that cannot be rendered locally)
+            chart_types = [page for page in CHART_PAGES if module_has_page(index, module_code, page)]
+            covered = []
+            if local_charts and module_code in all_grades:
+                covered = covered_chart_pages(module_code, all_grades[module_code], previous_grades)
+                chart_types = [page for page in chart_types if page not in covered]
+            
+            if not chart_types and covered:
+                print(f"  📈 Charts for {module_code} will be rendered locally")
+            elif not chart_types:
+                print(f"  📈 No chart pages listed for {module_code}")
+            else:
+                try:
+                    with progress.stage("charts"):
+                        charts_saved = save_charts_as_png(driver, module_code, charts_dir, base_url, index, chart_types)
+                    if charts_saved > 0:
+                        total_charts_saved += charts_saved
+                        successful_modules += 1
+                        print(f"  ✅ {charts_saved} charts saved for {module_code}")
+                    else:
+                        print(f"  ⚠️ No charts saved for {module_code}")
+                except SessionExpired:
+                    session_lost = True
+                    parked.append(module_code)
+                    progress.skip_module()
+                    print(f"  ⏸️ Session expired, {module_code} parked")
+                    continue
+                except Exception as e:
+                    print(f"  ⚠️ Error extracting charts for {module_code}: {e}")
             
             # Small delay between modules
             time.sleep(2)
         
-        # Step 3: Create Excel workbook with grades data
-        if all_grades:
-            print(f"\n📊 Creating Excel workbook with grades and charts...")
-            
-            with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-                # Write individual module sheets with grades
-                for module_code, df in all_grades.items():
-                    df.to_excel(writer, sheet_name=module_code, index=False)
-                
-                # Write summary sheet
-                if all_summaries:
-                    summary_df = pd.concat(all_summaries)
-                    summary_df.to_excel(writer, sheet_name="Summary")
-            
-            # Step 4: Add charts to the existing workbook
-            print("📈 Adding charts to Excel sheets...")
-            wb = load_workbook(output_filename)
+        progress.finish_module()
+        
+        # Remember empty pages so later runs skip them immediately
+        save_probes(index, index_dir)
+        
+        # Render the charts that were not captured from MMS, all modules in one batch
+        if local_charts and all_grades:
+            print(f"\n📈 Rendering charts locally for {len(all_grades)} modules...")
+            with progress.stage("local charts"):
+                rendered = render_all_charts(all_grades, previous_grades, charts_dir)
+            local_count = sum(len(pages) for pages in rendered.values())
+            total_charts_saved += local_count
+            print(f"  ✅ {local_count} charts rendered")
             
-            charts_added = 0
-            for module_code in all_grades.keys():
-                if add_charts_to_excel(wb, module_code, charts_dir):
-                    charts_added += 1
+            # Capture from MMS whatever was planned for local rendering but failed to draw
+            for module_code, pages in rendered.items():
+                failed = [page for page in covered_chart_pages(module_code, all_grades[module_code], previous_grades)
+                          if page not in pages and module_has_page(index, module_code, page)]
+                if not failed:
+                    continue
+                if session_lost:
+                    print(f"  ⏸️ Session expired, {module_code} keeps only its rendered charts")
+                    continue
+                print(f"  📷 Capturing {', '.join(failed)} for {module_code} from MMS instead")
+                try:
+                    total_charts_saved += save_charts_as_png(driver, module_code, charts_dir, base_url, index, failed)
+                except SessionExpired:
+                    print(f"  ⏸️ Session expired, {module_code} keeps only its rendered charts")
+        
+        # Keep a snapshot of this year's grades for year-over-year comparisons
+        if all_grades:
+            footers = {summary.module: summary.footer for summary in all_summaries}
+            snapshot_file = save_snapshot(all_grades, year, semester, snapshot_dir, footers)
+            print(f"💾 Grade snapshot saved: {snapshot_file}")
+        
+        # Step 3: Create Excel workbook with grades data and charts
+        if all_grades:
+            summary_df = summaries_to_dataframe(all_summaries)
+            with progress.stage("workbook"):
+                charts_added = build_workbook(all_grades, summary_df, output_filename, charts_dir, student_index_path,
+                                              quantize=not lossless_charts)
             
-            wb.save(output_filename)
+            if shard:
+                write_shard_output(*shard, summary_df, planned_codes, year, semester)
             
             # Final summary
             print("\n" + "=" * 60)
@@ -339,6 +546,8 @@ def main():
             print(f"Processed modules: {len(module_codes)}")
             print(f"Modules with grades: {len(all_grades)}")
             print(f"Modules with charts: {successful_modules}")
+            if parked:
+                print(f"Modules parked after session expiry: {', '.join(parked)}")
             print(f"Total charts saved: {total_charts_saved}")
             print(f"Sheets with charts added: {charts_added}")
             print(f"Output file: {output_filename}")
@@ -346,6 +555,18 @@ def main():
             
         else:
             print("❌ No grades data collected. Please check authentication and module URLs.")
+        
+        # Parked modules are retried by a later --resume run, after logging in again
+        parked_file = save_parked(parked, year, semester, parked_dir)
+        if parked_file:
+            print(f"\n⏸️ {len(parked)} modules parked after the MMS session expired: {', '.join(parked)}")
+            print(f"   Run again with --resume to retry them (list saved to {parked_file})")
+        
+        # Keep a throughput record so runs can be compared across semesters
+        progress.write_history(year=year, semester=semester,
+                               shard=f"{shard[0]}/{shard[1]}" if shard else None,
+                               local_charts=local_charts, modules_with_grades=len(all_grades),
+                               parked=len(parked), resumed=resume)
     
     except KeyboardInterrupt:
         print("\nProcess interrupted by user")
@@ -355,6 +576,8 @@ def main():
         #print("Full error traceback:")
         #traceback.print_exc()
     finally:
+        if heartbeat is not None:
+            heartbeat.stop()
         input("\nPress Enter to close the browser...")
         driver.quit()
         
@@ -377,4 +600,13 @@ def main():
             print(f"Note: Error during cleanup: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Usage: python ModuleGradesChartsExtractor.py [--year 2023_4] [--semester S1]
+    #            [--local-charts] [--shard I/N] [--reprobe] [--rediscover] [--lossless-charts] [--resume]
+    def option(name, default=None):
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+    
+    shard = parse_shard(option("--shard")) if "--shard" in sys.argv else None
+    main(local_charts="--local-charts" in sys.argv, shard=shard, reprobe="--reprobe" in sys.argv,
+         year=option("--year", DEFAULT_YEAR), semester=option("--semester", DEFAULT_SEMESTER),
+         lossless_charts="--lossless-charts" in sys.argv, resume="--resume" in sys.argv,
+         rediscover="--rediscover" in sys.argv)
\ No newline at end of file
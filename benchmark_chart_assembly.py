@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from PIL import Image as PILImage, ImageDraw
+
+from module_charts_downloader import generate_excel_from_charts
+
+
+def build_synthetic_charts(charts_dir, modules=40, charts_per_module=2, size=(1600, 900), no_data_modules=0):
+    """Create a charts/ tree of scatter-style PNGs the size of MMS chart screenshots.
+
+    The last ``no_data_modules`` modules get identical blank "no data" charts.
+    """
+    rng = random.Random(0)
+    for m in range(modules):
+        module_path = os.path.join(charts_dir, f"BM{1000 + m}")
+        os.makedirs(module_path, exist_ok=True)
+        for c in range(1, charts_per_module + 1):
+            if m >= modules - no_data_modules:
+                img = PILImage.new("RGB", size, "white")
+                ImageDraw.Draw(img).text((size[0] // 2, size[1] // 2), "No data", fill="grey")
+                img.save(os.path.join(module_path, f"ScatterChart_{c}.png"))
+                continue
+            img = PILImage.new("RGB", size, "white")
+            draw = ImageDraw.Draw(img)
+            for _ in range(400):
+                x, y = rng.randrange(size[0]), rng.randrange(size[1])
+                draw.ellipse((x - 6, y - 6, x + 6, y + 6), fill=(31, 119, 180))
+            img.save(os.path.join(module_path, f"ScatterChart_{c}.png"))
+
+
+def time_assembly(charts_dir, output_file, workers, quantize=True):
+    """Wall time, file size and image report of one workbook build"""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")  # Silence the per-chart progress lines while timing
+    try:
+        start = time.perf_counter()
+        report = generate_excel_from_charts(charts_dir, output_file, workers=workers, quantize=quantize)
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return elapsed, os.path.getsize(output_file), report
+
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    no_data_modules = modules // 4
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        charts_dir = os.path.join(tmp, "charts")
+        print(f"Building synthetic charts tree ({modules} modules, {no_data_modules} without data)...")
+        build_synthetic_charts(charts_dir, modules, no_data_modules=no_data_modules)
+        output_file = os.path.join(tmp, "bench.xlsx")
+
+        results = {workers: time_assembly(charts_dir, output_file, workers) for workers in worker_counts}
+        lossless = time_assembly(charts_dir, output_file, cores, quantize=False)
+
+    print(f"\nChart assembly benchmark ({modules * 2} charts, {cores} cores)")
+    print("=" * 60)
+    baseline = results[1][0]
+    for workers, (elapsed, size, _) in results.items():
+        print(f"  workers={workers:<3} {elapsed:7.2f}s  speedup x{baseline / elapsed:.2f}  {size / 1024:8.0f} KB")
+    elapsed, size, report = lossless
+    print(f"  lossless    {elapsed:7.2f}s               {size / 1024:8.0f} KB")
+    print(f"\n  Quantized images (default): {results[cores][2].summary()}")
+    print(f"  Lossless images: {report.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import io
+import os
+import re
+import shutil
+import hashlib
+import zipfile
+import tempfile
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+from PIL import Image as PILImage
+
+
+def _to_palette(img):
+    """Convert to a palette image when it has at most 256 colours (lossless), else return None"""
+    if img.mode == "RGBA" and img.getextrema()[3][0] == 255:
+        img = img.convert("RGB")  # Screenshots are fully opaque
+    if img.mode not in ("RGB", "L"):
+        return None
+
+    pixels = np.asarray(img.convert("RGB"), dtype=np.uint32)
+    codes = (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+    colors, indices = np.unique(codes, return_inverse=True)
+    if len(colors) > 256:
+        return None
+
+    palette_img = PILImage.fromarray(indices.reshape(codes.shape).astype(np.uint8), mode="P")
+    palette = np.stack([(colors >> 16) & 255, (colors >> 8) & 255, colors & 255], axis=1)
+    palette_img.putpalette(palette.astype(np.uint8).flatten().tolist())
+    return palette_img
+
+
+def optimize_png(img, quantize=True):
+    """Encode an image as a small PNG, palette-based when that is lossless or when quantize=True.
+
+    Resized screenshots are antialiased and nearly always have more than 256 colours, so in
+    practice the palette comes from quantize, which is lossy: the chart is reduced to its 256
+    most representative colours (visually identical for scatter charts, but not pixel-exact).
+    """
+    palette_img = _to_palette(img)
+    if palette_img is None and quantize:
+        palette_img = img.convert("RGB").quantize(colors=256)
+    buffer = io.BytesIO()
+    (palette_img or img).save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def plain_png_size(img):
+    """Size of a default PNG encode, i.e. what a plain img.save() of the resized chart writes"""
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.tell()
+
+
+def prepare_chart_image(chart_path, max_size=(600, 400), quantize=True):
+    """Resize a chart PNG for embedding in Excel and return (png_bytes, plain_bytes, error).
+
+    plain_bytes is the size of the same resized chart saved without optimization, the
+    baseline the savings are reported against.
+    """
+    try:
+        with PILImage.open(chart_path) as img:
+            img.thumbnail(max_size)  # Resize to max dimensions
+            return optimize_png(img, quantize), plain_png_size(img), None
+    except Exception as e:
+        return None, 0, str(e)
+
+
+def prepare_chart_images(chart_paths, max_size=(600, 400), workers=None, quantize=True):
+    """Prepare charts over a process pool, yielding (path, png_bytes, plain_bytes, error) in input order"""
+    chart_paths = list(chart_paths)
+    workers = workers or os.cpu_count() or 1
+    prepare = partial(prepare_chart_image, max_size=max_size, quantize=quantize)
+
+    if workers == 1 or len(chart_paths) < 2:
+        for chart_path in chart_paths:
+            yield (chart_path, *prepare(chart_path))
+        return
+
+    # map() hands results back in submission order as soon as each one is ready,
+    # so the workbook can be filled while later images are still being resized
+    chunksize = max(1, len(chart_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chart_path, result in zip(chart_paths, executor.map(prepare, chart_paths, chunksize=chunksize)):
+            yield (chart_path, *result)
+
+
+@dataclass(slots=True)
+class ImageStageReport:
+    """Byte counts for the chart image stage of a workbook build, against a plain re-encode"""
+    plain_bytes: int = 0
+    optimized_bytes: int = 0
+    images: int = 0
+    duplicates_removed: int = 0
+    duplicate_bytes: int = 0
+
+    def add(self, png_bytes, plain_bytes):
+        """Account for one prepared chart and the size its plain re-encode would have had"""
+        self.plain_bytes += plain_bytes
+        self.optimized_bytes += len(png_bytes)
+        self.images += 1
+
+    @property
+    def bytes_saved(self):
+        return self.plain_bytes - self.optimized_bytes + self.duplicate_bytes
+
+    def summary(self):
+        return (f"{self.images} charts, {self.plain_bytes / 1024:.0f} KB as plain PNGs -> "
+                f"{(self.optimized_bytes - self.duplicate_bytes) / 1024:.0f} KB embedded, "
+                f"{self.duplicates_removed} duplicates stored once, "
+                f"{self.bytes_saved / 1024:.0f} KB saved")
+
+
+MEDIA_TARGET_RE = re.compile(r'Target="(/?xl/media/[^"]+|\.\./media/[^"]+)"')
+
+
+def dedupe_workbook_media(filename, report=None):
+    """Store each unique image of a saved workbook once, pointing every drawing at it by content hash"""
+    with zipfile.ZipFile(filename) as archive:
+        entries = {info.filename: archive.read(info.filename) for info in archive.infolist()}
+
+    canonical = {}   # content hash -> first media file with that content
+    replaced = {}    # duplicate media file -> canonical media file
+    for name in sorted(entries, key=lambda n: (len(n), n)):
+        if not name.startswith("xl/media/"):
+            continue
+        digest = hashlib.sha256(entries[name]).hexdigest()
+        if digest in canonical:
+            replaced[name] = canonical[digest]
+        else:
+            canonical[digest] = name
+
+    if not replaced:
+        return 0
+
+    def retarget(match):
+        target = match.group(1)
+        folder, media_name = target.rsplit("/", 1)
+        duplicate = f"xl/media/{media_name}"
+        if duplicate not in replaced:
+            return match.group(0)
+        return f'Target="{folder}/{os.path.basename(replaced[duplicate])}"'
+
+    saved = 0
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(filename)))
+    os.close(tmp_fd)
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            if name in replaced:
+                saved += len(data)
+                continue
+            if name.startswith("xl/drawings/_rels/"):
+                data = MEDIA_TARGET_RE.sub(retarget, data.decode("utf-8")).encode("utf-8")
+            archive.writestr(name, data)
+    shutil.move(tmp_path, filename)
+
+    if report is not None:
+        report.duplicates_removed += len(replaced)
+        report.duplicate_bytes += saved
+    return saved
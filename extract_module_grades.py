@@ -9,6 +9,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from openpyxl import Workbook
 
+from module_index import module_base_url
+
 
 # === Step 1: Setup Edge WebDriver ===
 def setup_driver():
@@ -28,7 +30,7 @@ def manual_authentication(driver):
     print("3. Navigate to any module page to verify.")
     print("4. Come back here and press Enter to continue.")
     
-    test_url = "https://mms.st-andrews.ac.uk/mms/module/2024_5/S2/GG1002/Final+grade/"
+    test_url = f"{module_base_url()}/GG1002/Final+grade/"
     driver.get(test_url)
     input("Press Enter once you have logged in and see the module page...")
     print("Authentication complete.\n")
@@ -36,7 +38,7 @@ def manual_authentication(driver):
 
 # === Step 3: Extract grades from a module ===
 def extract_grades_from_module(driver, module_code):
-    url = f"https://mms.st-andrews.ac.uk/mms/module/2024_5/S2/{module_code}/Final+grade/"
+    url = f"{module_base_url()}/{module_code}/Final+grade/"
     print(f"Processing module: {module_code}")
     driver.get(url)
     WebDriverWait(driver, 10).until(
@@ -88,15 +90,7 @@ def save_to_excel(data_dict, filename="ModuleGrades.xlsx"):
 
 # === Step 5: Main script logic ===
 def main():
-    """
-    module_codes = [
-        'GG4258', 'GG3281', 'GG1002', 'GG2014', 'GG4248', 'GG4247', 'SS5103',
-        'GG4254', 'GG4257', 'GG3205', 'GG3213', 'GG3214', 'GG5005', 'GG4399',
-        'SD4126', 'SD4129', 'SD4133', 'SD1004', 'SD4225', 'SD2006', 'SD2100',
-        'SD4110', 'SD3102', 'SD3101', 'SD4120', 'SD4125', 'SD4297', 'SD5801',
-        'SD5802', 'SD5805', 'SD5806', 'SD5807', 'SD5810', 'SD5820', 'SD5821',
-        'SD5811', 'SD5813', 'SD5812'
-    ]"""
+    # Full run: module_codes = plan_modules(load_module_index()) (see module_index.py)
     module_codes = [
         'GG4258', 'GG3281'
     ]
@@ -0,0 +1,77 @@
+import os
+import json
+import pandas as pd
+
+from module_index import DEFAULT_YEAR, DEFAULT_SEMESTER
+
+
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_COLUMNS = ['Module', 'Matric Number', 'Calc Grade']
+
+
+def snapshot_path(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, snapshot_dir=SNAPSHOT_DIR):
+    """Location of the stored grade snapshot for a (year, semester)"""
+    return os.path.join(snapshot_dir, f"grades_{year}_{semester}.csv")
+
+
+def footers_path(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, snapshot_dir=SNAPSHOT_DIR):
+    """Location of the MMS table footers stored with a snapshot"""
+    return os.path.join(snapshot_dir, f"footers_{year}_{semester}.json")
+
+
+def _footer_value(value):
+    """Footer cell as a JSON-friendly value (numbers as floats, blanks as None)"""
+    if isinstance(value, str):
+        return value
+    return None if pd.isna(value) else float(value)
+
+
+def grades_to_snapshot(all_grades):
+    """Stack the per-module grade DataFrames into one long table"""
+    frames = [df[['Matric Number', 'Calc Grade']].assign(Module=module_code)
+              for module_code, df in all_grades.items()]
+    if not frames:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[SNAPSHOT_COLUMNS]
+
+
+def snapshot_to_grades(snapshot):
+    """Split a long snapshot table back into per-module grade DataFrames"""
+    return {module_code: group[['Matric Number', 'Calc Grade']].reset_index(drop=True)
+            for module_code, group in snapshot.groupby('Module', sort=False)}
+
+
+def save_snapshot(all_grades, year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, snapshot_dir=SNAPSHOT_DIR,
+                  footers=None):
+    """Store the grades of a run so later runs can compare against them without re-scraping.
+
+    footers ({module: {label: value}}) keeps the scraped MMS table footers next to the grades.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = snapshot_path(year, semester, snapshot_dir)
+    grades_to_snapshot(all_grades).to_csv(path, index=False)
+    if footers is not None:
+        stored = {module_code: {str(label): _footer_value(value) for label, value in footer.items()}
+                  for module_code, footer in footers.items() if module_code in all_grades}
+        with open(footers_path(year, semester, snapshot_dir), "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_snapshot(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, snapshot_dir=SNAPSHOT_DIR):
+    """Load a stored grade snapshot, or return None if that year has not been scraped"""
+    path = snapshot_path(year, semester, snapshot_dir)
+    if not os.path.exists(path):
+        return None
+    snapshot = pd.read_csv(path, dtype={'Module': str, 'Matric Number': str})
+    snapshot['Calc Grade'] = pd.to_numeric(snapshot['Calc Grade'], errors='coerce')
+    return snapshot
+
+
+def load_footers(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, snapshot_dir=SNAPSHOT_DIR):
+    """MMS table footers stored with a snapshot, {module: {label: value}} (empty if none)"""
+    path = footers_path(year, semester, snapshot_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,104 @@
+from dataclasses import dataclass, field
+import pandas as pd
+
+
+# Footer labels MMS uses for the statistics the exam board report needs
+FOOTER_LABELS = {"count": "Count", "mean": "Mean", "std": "Std. Dev."}
+
+# Grade bands reported on the Summary and Year Comparison sheets: field -> (column, rule)
+GRADE_BANDS = {
+    "pct_gte_16_5": ('% ≥ 16.5', lambda grades: grades >= 16.5),
+    "pct_14_16": ('% between 14–16', lambda grades: (grades >= 14) & (grades < 16)),
+}
+
+# Decimals for means, standard deviations and band percentages
+STAT_DECIMALS = 2
+
+
+def _to_number(value):
+    """Parse a footer value, returning None for blanks and non-numeric text"""
+    number = pd.to_numeric(value, errors='coerce')
+    return None if pd.isna(number) else float(number)
+
+
+@dataclass(slots=True)
+class ModuleSummary:
+    """One module's row on the Summary sheet"""
+    module: str
+    count: float | None = None
+    mean: float | None = None
+    std: float | None = None
+    pct_gte_16_5: float | None = None
+    pct_14_16: float | None = None
+    footer: dict = field(default_factory=dict)  # label -> value, as shown in #gradesTable tfoot
+
+    def to_row(self):
+        """Columns for the Summary sheet: the computed stats and grade bands, then the scraped footer"""
+        row = {'Module': self.module}
+        for name, label in FOOTER_LABELS.items():
+            value = getattr(self, name)
+            if value is not None:
+                row[label] = value
+        for name, (label, _) in GRADE_BANDS.items():
+            value = getattr(self, name)
+            if value is not None:
+                row[label] = value
+        # Footer values stay in their own columns so they are never mistaken for computed ones
+        for label, value in self.footer.items():
+            label = str(label).strip()
+            if label:
+                number = _to_number(value)
+                row[f"MMS {label} (scraped)"] = value if number is None else number
+        return row
+
+
+def footer_stats(footer):
+    """Count, mean and std parsed from the footer rows of a grades table (None where missing)"""
+    lookup = {str(label).strip().lower(): value for label, value in footer.items()}
+    return {name: _to_number(lookup.get(label.lower())) for name, label in FOOTER_LABELS.items()}
+
+
+def summaries_to_dataframe(summaries):
+    """Materialize all module summaries into the Summary sheet DataFrame in one go"""
+    df = pd.DataFrame.from_records([summary.to_row() for summary in summaries])
+    if df.empty:
+        return df
+    return df.set_index('Module')
+
+
+def summarize_grades(module_code, grades, footer=None):
+    """Compute a module's summary from its student grades; the scraped footer is kept for cross-checks"""
+    grades = pd.to_numeric(grades, errors='coerce').dropna()
+    total_students = len(grades)
+
+    def pct(mask):
+        return round(mask.sum() / total_students * 100, STAT_DECIMALS) if total_students > 0 else 0
+
+    return ModuleSummary(
+        module_code,
+        count=total_students,
+        mean=round(float(grades.mean()), STAT_DECIMALS) if total_students > 0 else None,
+        std=round(float(grades.std()), STAT_DECIMALS) if total_students > 1 else None,
+        **{name: pct(rule(grades)) for name, (_, rule) in GRADE_BANDS.items()},
+        footer=dict(footer or {}),
+    )
+
+
+def check_against_footer(summary, tolerance=0.05):
+    """List the computed statistics that disagree with the footer scraped from MMS"""
+    scraped = footer_stats(summary.footer)
+    mismatches = []
+    for name, label in FOOTER_LABELS.items():
+        computed, expected = getattr(summary, name), scraped[name]
+        if computed is None or expected is None:
+            continue
+        if abs(computed - expected) > tolerance:
+            mismatches.append(f"{label}: computed {computed} vs MMS {expected}")
+    return mismatches
+
+
+def summaries_from_grades(all_grades, footers=None):
+    """Summaries for every module from already-parsed student rows, without visiting MMS"""
+    footers = footers or {}
+    return [summarize_grades(module_code, df['Calc Grade'], footers.get(module_code))
+            for module_code, df in all_grades.items()]
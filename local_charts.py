@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # Headless backend, no display needed
+import matplotlib.pyplot as plt
+
+
+# Local renderings replace the screenshots of these MMS pages
+CHART_FILES = {
+    "GraphPage": "ScatterChart_1.png",
+    "SubmitResults": "ScatterChart_2.png",
+}
+GRADE_BINS = np.arange(0, 20.5, 0.5)
+
+
+def covered_chart_pages(module_code, grades, previous_grades=None):
+    """MMS chart pages that can be rendered locally for a module (same checks as render_module_charts)"""
+    pages = []
+    if len(_grade_array(grades)) > 0:
+        pages.append("GraphPage")
+        previous_grades = previous_grades or {}
+        if module_code in previous_grades and len(_grade_array(previous_grades[module_code])) > 0:
+            pages.append("SubmitResults")
+    return pages
+
+
+def _scatter_with_distribution(fig, grades, label, color):
+    """Scatter of student grades beside their distribution, like the MMS GraphPage"""
+    scatter_ax, hist_ax = fig.subplots(1, 2, sharey=True, gridspec_kw={"width_ratios": [3, 1]})
+    ranks = np.arange(1, len(grades) + 1)
+    scatter_ax.scatter(ranks, np.sort(grades), s=18, color=color, label=label)
+    scatter_ax.set_xlabel("Students (sorted by grade)")
+    scatter_ax.set_ylabel("Calc Grade")
+    scatter_ax.set_ylim(0, 20)
+    scatter_ax.grid(alpha=0.3)
+    hist_ax.hist(grades, bins=GRADE_BINS, orientation="horizontal", color=color, alpha=0.8)
+    hist_ax.set_xlabel("Students")
+    return scatter_ax, hist_ax
+
+
+def render_graph_page_chart(module_code, grades, path):
+    """Current-year scatter and grade distribution"""
+    fig = plt.figure(figsize=(10, 5), dpi=100)
+    scatter_ax, _ = _scatter_with_distribution(fig, grades, "This year", "#1f77b4")
+    scatter_ax.axhline(np.mean(grades), color="grey", linestyle="--", linewidth=1)
+    fig.suptitle(f"{module_code} Final grade (n={len(grades)}, mean={np.mean(grades):.2f})")
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+
+
+def render_submit_results_chart(module_code, grades, previous, path):
+    """Current-year distribution against the previous year's, like the MMS SubmitResults page"""
+    fig = plt.figure(figsize=(10, 5), dpi=100)
+    scatter_ax, hist_ax = _scatter_with_distribution(fig, grades, "This year", "#1f77b4")
+    ranks = np.linspace(1, len(grades), len(previous)) if len(previous) > 1 else [1]
+    scatter_ax.scatter(ranks, np.sort(previous), s=18, color="#ff7f0e", alpha=0.6, label="Previous year")
+    hist_ax.hist(previous, bins=GRADE_BINS, orientation="horizontal", histtype="step", color="#ff7f0e")
+    scatter_ax.legend(loc="lower right")
+    fig.suptitle(f"{module_code} Final grade compared with previous year")
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+
+
+def render_module_charts(module_code, grades, previous, charts_dir="charts"):
+    """Render one module's charts into charts/<module>/, returning the pages covered"""
+    folder_path = os.path.join(charts_dir, module_code)
+    os.makedirs(folder_path, exist_ok=True)
+
+    rendered = []
+    if len(grades) == 0:
+        return rendered
+    charts = {"GraphPage": lambda path: render_graph_page_chart(module_code, grades, path)}
+    if previous is not None and len(previous) > 0:
+        charts["SubmitResults"] = lambda path: render_submit_results_chart(module_code, grades, previous, path)
+
+    # A chart that fails to draw is left out so it can be captured from MMS instead
+    for page, render in charts.items():
+        try:
+            render(os.path.join(folder_path, CHART_FILES[page]))
+            rendered.append(page)
+        except Exception as e:
+            plt.close("all")
+            print(f"  ⚠️ Could not render {page} chart for {module_code}: {e}")
+    return rendered
+
+
+def _grade_array(df):
+    """Numeric grades of a module as a plain array (cheap to send to worker processes)"""
+    return pd.to_numeric(df['Calc Grade'], errors='coerce').dropna().to_numpy()
+
+
+def render_all_charts(all_grades, previous_grades=None, charts_dir="charts", workers=None):
+    """Render charts for every module across a process pool, returning {module: pages rendered}.
+
+    A module whose worker fails (or a pool that breaks) maps to no pages, never an exception.
+    """
+    previous_grades = previous_grades or {}
+    modules = list(all_grades)
+    grades = [_grade_array(all_grades[m]) for m in modules]
+    previous = [_grade_array(previous_grades[m]) if m in previous_grades else None for m in modules]
+
+    rendered = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {module: executor.submit(render_module_charts, module, module_grades, module_previous, charts_dir)
+                   for module, module_grades, module_previous in zip(modules, grades, previous)}
+        for module, future in futures.items():
+            try:
+                rendered[module] = future.result()
+            except Exception as e:  # Includes BrokenProcessPool when a worker dies
+                print(f"  ⚠️ Rendering charts for {module} failed: {e}")
+                rendered[module] = []
+    return rendered
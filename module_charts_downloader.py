@@ -1,3 +1,4 @@
+import io
 import os
 import time
 from selenium import webdriver
@@ -10,7 +11,9 @@ from selenium.webdriver.edge.service import Service
 
 from openpyxl import Workbook
 from openpyxl.drawing.image import Image as XLImage
-from PIL import Image as PILImage
+
+from chart_images import prepare_chart_images, dedupe_workbook_media, ImageStageReport
+from module_index import module_base_url, load_module_index, plan_modules
 
 
 def setup_driver():
@@ -35,7 +38,7 @@ def manual_authentication(driver):
     print()
     
     # Open the login page
-    test_url = "https://mms.st-andrews.ac.uk/mms/module/2024_5/S2/GG3214/Final+grade/GraphPage"
+    test_url = f"{module_base_url()}/GG3214/Final+grade/GraphPage"
     print(f"Opening: {test_url}")
     driver.get(test_url)
     
@@ -150,16 +153,10 @@ def download_all_charts():
     print("St Andrews Module Charts Downloader")
     print("=" * 50)
     
-    # Module codes to process
-   
-    module_codes = ['GG4258', 'GG3281', 'GG1002', 'GG2014', 'GG4248', 'GG4247', 'SS5103',
-    'GG4254', 'GG4257', 'GG3205', 'GG3213', 'GG3214', 'GG5005', 'GG4399',
-    'SD4126', 'SD4129', 'SD4133', 'SD1004', 'SD4225', 'SD2006', 'SD2100',
-    'SD4110', 'SD3102', 'SD3101', 'SD4120', 'SD4125', 'SD4297', 'SD5801',
-    'SD5802', 'SD5805', 'SD5806', 'SD5807', 'SD5810', 'SD5820', 'SD5821',
-    'SD5811', 'SD5813', 'SD5812']
+    # Module codes to process (from the cached module index, see module_index.py)
+    module_codes = plan_modules(load_module_index())
     
-    base_url = "https://mms.st-andrews.ac.uk/mms/module/2024_5/S2/{}/Final+grade/GraphPage"
+    base_url = module_base_url() + "/{}/Final+grade/GraphPage"
     
     # Create main charts folder
     os.makedirs("charts", exist_ok=True)
@@ -224,45 +221,54 @@ def download_all_charts():
         driver.quit()
         
 
-def generate_excel_from_charts(charts_dir="charts", output_file="ModuleCharts.xlsx"):
-    """Creates an Excel file with one sheet per module, embedding saved PNG charts."""
+def generate_excel_from_charts(charts_dir="charts", output_file="ModuleCharts.xlsx", workers=None, quantize=True):
+    """Creates an Excel file with one sheet per module, embedding saved PNG charts.
+
+    Images are resized and optimized over a process pool (``workers`` processes, default
+    one per core) and embedded in sheet order as they come back. Identical images are
+    stored once in the saved workbook. quantize=True reduces each chart to 256 colours
+    (lossy); pass False to embed the resized charts pixel-exact. Returns an ImageStageReport.
+    """
     print("\nGenerating Excel file with charts...")
     wb = Workbook()
     wb.remove(wb.active)  # remove default sheet
 
-    for module_code in os.listdir(charts_dir):
+    # Plan every sheet and chart up front so the images can be prepared in parallel
+    chart_jobs = []
+    for module_code in sorted(os.listdir(charts_dir)):
         module_path = os.path.join(charts_dir, module_code)
         if not os.path.isdir(module_path):
             continue
 
-        sheet = wb.create_sheet(title=module_code)
-        row_pos = 1
+        wb.create_sheet(title=module_code)
 
         # Sort to maintain order (e.g., Chart_1.png, Chart_2.png)
         for chart_file in sorted(os.listdir(module_path)):
-            if not chart_file.lower().endswith('.png'):
+            if not chart_file.lower().endswith('.png') or chart_file.endswith('_resized.png'):
                 continue
+            chart_jobs.append((module_code, chart_file, os.path.join(module_path, chart_file)))
 
-            chart_path = os.path.join(module_path, chart_file)
+    row_pos = {module_code: 1 for module_code in wb.sheetnames}
+    prepared = prepare_chart_images([path for _, _, path in chart_jobs], (600, 400), workers, quantize)
+    report = ImageStageReport()
 
-            try:
-                # Resize to avoid huge scaling in Excel
-                img = PILImage.open(chart_path)
-                img.thumbnail((600, 400))  # Resize to max dimensions
-                temp_path = chart_path.replace(".png", "_resized.png")
-                img.save(temp_path)
+    for (module_code, chart_file, chart_path), (_, png_bytes, plain_bytes, error) in zip(chart_jobs, prepared):
+        if error:
+            print(f"  ✗ Failed to add {chart_file} to sheet {module_code}: {error}")
+            continue
 
-                xl_img = XLImage(temp_path)
-                cell_location = f"A{row_pos}"
-                sheet.add_image(xl_img, cell_location)
-                row_pos += 20  # space between charts
+        report.add(png_bytes, plain_bytes)
+        xl_img = XLImage(io.BytesIO(png_bytes))
+        wb[module_code].add_image(xl_img, f"A{row_pos[module_code]}")
+        row_pos[module_code] += 20  # space between charts
 
-                print(f"  Added {chart_file} to sheet {module_code}")
-            except Exception as e:
-                print(f"  ✗ Failed to add {chart_file} to sheet {module_code}: {e}")
+        print(f"  Added {chart_file} to sheet {module_code}")
 
     wb.save(output_file)
+    dedupe_workbook_media(output_file, report)
     print(f"\n✓ Excel file created: {output_file}")
+    print(f"  Images: {report.summary()}")
+    return report
 
 if __name__ == "__main__":
     download_all_charts()
@@ -0,0 +1,211 @@
+import os
+import re
+import json
+import time
+from bs4 import BeautifulSoup
+
+
+MMS_ROOT = "https://mms.st-andrews.ac.uk/mms"
+MODULE_LISTING_URL = f"{MMS_ROOT}/user/me/Modules"
+DEFAULT_YEAR = "2024_5"
+DEFAULT_SEMESTER = "S2"
+INDEX_DIR = "cache"
+
+# A cached index older than this is rediscovered, so new chart links are picked up
+INDEX_TTL_DAYS = 30
+
+# Fallback list used when no index has been discovered yet
+DEFAULT_MODULE_CODES = ['GG4258', 'GG3281', 'GG1002', 'GG2014', 'GG4248', 'GG4247', 'SS5103',
+                        'GG4254', 'GG4257', 'GG3205', 'GG3213', 'GG3214', 'GG5005', 'GG4399',
+                        'SD4126', 'SD4129', 'SD4133', 'SD1004', 'SD4225', 'SD2006', 'SD2100',
+                        'SD4110', 'SD3102', 'SD3101', 'SD4120', 'SD4125', 'SD4297', 'SD5801',
+                        'SD5802', 'SD5805', 'SD5806', 'SD5807', 'SD5810', 'SD5820', 'SD5821',
+                        'SD5811', 'SD5813', 'SD5812']
+
+# Pages of the "Final grade" assessment used by the extractors
+GRADES_PAGE = "Final+grade"
+CHART_PAGES = ["GraphPage", "SubmitResults"]
+
+MODULE_LINK_RE = re.compile(r"/mms/module/(\d{4}_\d)/(S\d)/([A-Z]{2}\d{4})/")
+
+
+def module_base_url(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER):
+    """Base URL for all modules of an academic year and semester"""
+    return f"{MMS_ROOT}/module/{year}/{semester}"
+
+
+def previous_year(year):
+    """Academic year before the given one, e.g. 2024_5 -> 2023_4"""
+    start = int(year.split("_")[0]) - 1
+    return f"{start}_{(start + 1) % 10}"
+
+
+def index_path(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, index_dir=INDEX_DIR):
+    """Location of the cached module index for a (year, semester)"""
+    return os.path.join(index_dir, f"module_index_{year}_{semester}.json")
+
+
+def load_module_index(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, index_dir=INDEX_DIR):
+    """Load a cached module index, or return None if it has not been discovered yet"""
+    path = index_path(year, semester, index_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_module_index(index, index_dir=INDEX_DIR):
+    """Write the module index to the cache directory"""
+    os.makedirs(index_dir, exist_ok=True)
+    path = index_path(index["year"], index["semester"], index_dir)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    return path
+
+
+def find_module_codes(page_html, year, semester):
+    """Return module codes linked from a listing page for the given year and semester"""
+    soup = BeautifulSoup(page_html, "html.parser")
+    codes = []
+    for link in soup.find_all("a", href=True):
+        match = MODULE_LINK_RE.search(link["href"])
+        if match and match.group(1) == year and match.group(2) == semester:
+            code = match.group(3)
+            if code not in codes:
+                codes.append(code)
+    return codes
+
+
+def find_module_pages(page_html, module_code):
+    """Return the Final grade pages actually linked from a module page"""
+    soup = BeautifulSoup(page_html, "html.parser")
+    hrefs = [link["href"].rstrip("/") for link in soup.find_all("a", href=True)
+             if f"/{module_code}/{GRADES_PAGE}" in link["href"]]
+
+    pages = []
+    if hrefs:
+        pages.append(GRADES_PAGE)
+    for chart_page in CHART_PAGES:
+        if any(href.endswith(f"/{GRADES_PAGE}/{chart_page}") for href in hrefs):
+            pages.append(chart_page)
+    return pages
+
+
+def discover_modules(driver, year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, listing_url=MODULE_LISTING_URL):
+    """Crawl the MMS module listing and build an index of modules and their pages.
+
+    Returns None when the listing page cannot be read.
+    """
+    print(f"🔎 Discovering modules for {year} {semester}...")
+    try:
+        driver.get(listing_url)
+        codes = find_module_codes(driver.page_source, year, semester)
+    except Exception as e:
+        print(f"  ⚠️ Could not read module listing {listing_url}: {e}")
+        return None
+    print(f"  Found {len(codes)} modules in listing")
+
+    base_url = module_base_url(year, semester)
+    modules = {}
+    for code in codes:
+        try:
+            # Chart links live on the Final grade page, the grades link on the front page
+            driver.get(f"{base_url}/{code}/")
+            pages = find_module_pages(driver.page_source, code)
+            if GRADES_PAGE in pages:
+                driver.get(f"{base_url}/{code}/{GRADES_PAGE}/")
+                linked = find_module_pages(driver.page_source, code)
+                pages += [page for page in linked if page not in pages]
+        except Exception as e:
+            print(f"  ⚠️ Could not inspect {code}: {e}")
+            pages = []
+        modules[code] = {"pages": pages}
+        print(f"  {code}: {', '.join(pages) if pages else 'no Final grade pages'}")
+
+    return {
+        "year": year,
+        "semester": semester,
+        "discovered_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "modules": modules,
+    }
+
+
+def index_age_days(index):
+    """Days since the index was discovered (infinite when the date is unknown)"""
+    try:
+        discovered = time.mktime(time.strptime(index["discovered_at"], "%Y-%m-%d %H:%M:%S"))
+    except (KeyError, TypeError, ValueError):
+        return float("inf")
+    return (time.time() - discovered) / 86400
+
+
+def load_or_discover_index(driver, year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER,
+                           index_dir=INDEX_DIR, refresh=False, ttl_days=INDEX_TTL_DAYS):
+    """Return the cached module index, crawling MMS when there is none, it is older than
+    ttl_days, or refresh=True. Recorded probe results are carried over to a new index."""
+    cached = load_module_index(year, semester, index_dir)
+    if cached is not None and not refresh:
+        age = index_age_days(cached)
+        if age <= ttl_days:
+            print(f"📂 Using cached module index ({len(cached['modules'])} modules, {age:.0f} days old)")
+            return cached
+        print(f"📂 Cached module index is older than {ttl_days} days, rediscovering")
+
+    index = discover_modules(driver, year, semester)
+    if not index or not index["modules"]:
+        if cached is not None:
+            print("  ⚠️ Discovery found no modules, keeping the cached index")
+            return cached
+        print("  ⚠️ Discovery found no modules, index not saved")
+        return None
+    for code, entry in (cached or {}).get("modules", {}).items():
+        if code in index["modules"] and entry.get("probes"):
+            index["modules"][code]["probes"] = entry["probes"]
+    path = save_module_index(index, index_dir)
+    print(f"  ✓ Module index saved: {path}")
+    return index
+
+
+def modules_with_page(index, page=GRADES_PAGE):
+    """Module codes in the index that have the given page"""
+    return [code for code, entry in index["modules"].items() if page in entry["pages"]]
+
+
+def plan_modules(index, page=GRADES_PAGE):
+    """Modules to schedule for a run, falling back to DEFAULT_MODULE_CODES without a usable index"""
+    if index:
+        codes = modules_with_page(index, page)
+        if codes:
+            added = [code for code in codes if code not in DEFAULT_MODULE_CODES]
+            dropped = [code for code in DEFAULT_MODULE_CODES if code not in codes]
+            if added:
+                print(f"➕ Modules in index but not in the default list: {', '.join(added)}")
+            if dropped:
+                print(f"➖ Default modules without a {page} page in the index: {', '.join(dropped)}")
+            return codes
+    print("⚠️ No module index available, using default module list")
+    return list(DEFAULT_MODULE_CODES)
+
+
+def module_has_page(index, module_code, page):
+    """Whether the index lists the page for a module (assumed True when the module is not indexed)"""
+    if not index or module_code not in index["modules"]:
+        return True
+    return page in index["modules"][module_code]["pages"]
+
+
+if __name__ == "__main__":
+    import sys
+    from ModuleGradesChartsExtractor import setup_driver, manual_login
+
+    year = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_YEAR
+    semester = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SEMESTER
+
+    driver = setup_driver()
+    try:
+        manual_login(driver, MODULE_LISTING_URL)
+        index = load_or_discover_index(driver, year, semester, refresh=True)
+        if index:
+            print(f"\nModules with {GRADES_PAGE}: {len(modules_with_page(index))}/{len(index['modules'])}")
+    finally:
+        driver.quit()
@@ -1,13 +1,15 @@
+import sys
 import time
 import os
 from selenium import webdriver
 from selenium.webdriver.edge.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from selenium.webdriver.edge.service import Service
-from openpyxl import Workbook
+
+from grade_snapshots import load_snapshot, snapshot_to_grades
+from grade_summary import ModuleSummary, summaries_to_dataframe, summaries_from_grades, check_against_footer
+from ModuleGradesChartsExtractor import extract_table_html, parse_html_table_to_dataframe, filter_grades_dataframe
+from module_index import DEFAULT_YEAR, DEFAULT_SEMESTER, module_base_url, load_module_index, plan_modules
 
 
 def setup_driver():
@@ -35,50 +37,47 @@ def manual_authentication(driver):
     return True
 
 def extract_summary_stats(driver, url, module_code):
-    """Extract summary stats (Count, Mean, Std. Dev.) from the table footer of a module."""
+    """Read a module's grades table and return its summary, with the footer keyed by row label."""
     print(f"Processing module {module_code}...")
     driver.get(url)
-    time.sleep(3)
 
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "gradesTable"))
-        )
-        tfoot = driver.find_element(By.CSS_SELECTOR, "#gradesTable tfoot")
-        cells = tfoot.find_elements(By.TAG_NAME, "td")
-        values = [cell.text.strip() for cell in cells if cell.text.strip()]
-        return [module_code] + values
+        # Same parsing as the main extractor, so footer rows are matched by their label
+        table_html = extract_table_html(driver)
+        df = parse_html_table_to_dataframe(table_html)
+        _, summary = filter_grades_dataframe(df, module_code)
+        return summary or ModuleSummary(module_code)
     except Exception as e:
         print(f"Failed to extract summary for {module_code}: {e}")
-        return [module_code, "ERROR"]
+        return ModuleSummary(module_code)
 
-def save_to_excel(data, filename="ModuleSummaries_2023_4.xlsx"):
+def save_to_excel(summaries, filename="ModuleSummaries.xlsx"):
     """Save summary statistics to a single Excel file."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Summary"
+    summaries_to_dataframe(summaries).to_excel(filename, sheet_name="Summary")
+    print(f"\n✓ Summary saved to Excel: {filename}")
 
-    for row in data:
-        ws.append(row)
+def run_summary_scraper(year=DEFAULT_YEAR, semester=DEFAULT_SEMESTER, scrape=False):
+    """Build the summary sheet from the stored grade snapshot, scraping MMS footers only when asked.
 
-    wb.save(filename)
-    print(f"\n✓ Summary saved to Excel: {filename}")
+    With scrape=True every module's footer is read from MMS and cross-checked against the
+    statistics computed from the snapshot (when one exists).
+    """
+    filename = f"ModuleSummaries_{year}.xlsx"
+    snapshot = load_snapshot(year, semester)
+    local_summaries = summaries_from_grades(snapshot_to_grades(snapshot)) if snapshot is not None else []
 
-def run_summary_scraper():
-    """Main function to authenticate, visit each module, extract stats and write to Excel."""
-    
-    module_codes = ['GG4258', 'GG3281', 'GG1002', 'GG2014', 'GG4248', 'GG4247', 'SS5103',
-    'GG4254', 'GG4257', 'GG3205', 'GG3213', 'GG3214', 'GG5005', 'GG4399',
-    'SD4126', 'SD4129', 'SD4133', 'SD1004', 'SD4225', 'SD2006', 'SD2100',
-    'SD4110', 'SD3102', 'SD3101', 'SD4120', 'SD4125', 'SD4297', 'SD5801',
-    'SD5802', 'SD5805', 'SD5806', 'SD5807', 'SD5810', 'SD5820', 'SD5821',
-    'SD5811', 'SD5813', 'SD5812']
-    
-    
-    base_url = "https://mms.st-andrews.ac.uk/mms/module/2024_5/S2/{}/Final+grade/" #URL for 2025-2 semestre (current year)
-    #base_url = "https://mms.st-andrews.ac.uk/mms/module/2023_4/S2/{}/Final+grade/" #URL for 2023-4 (previous year)
+    if local_summaries and not scrape:
+        print(f"Computed summaries for {len(local_summaries)} modules from the {year} {semester} snapshot.")
+        save_to_excel(local_summaries, filename)
+        return
+
+    if snapshot is None:
+        print(f"No grade snapshot for {year} {semester}, reading footers from MMS instead.")
+
+    module_codes = plan_modules(load_module_index(year, semester))
+    base_url = module_base_url(year, semester) + "/{}/Final+grade/"
     
-    summary_data = [["Module", "Count", "Mean", "Std. Dev."]]
+    summary_data = []
 
     driver = setup_driver()
 
@@ -92,15 +91,28 @@ def run_summary_scraper():
 
         for code in module_codes:
             url = base_url.format(code)
-            row = extract_summary_stats(driver, url, code)
-            summary_data.append(row)
+            summary_data.append(extract_summary_stats(driver, url, code))
             time.sleep(1)
 
-        save_to_excel(summary_data)
-
     finally:
         input("Press Enter to close browser...")
         driver.quit()
 
+    if not local_summaries:
+        save_to_excel(summary_data, filename)
+        return
+
+    # Cross-check the scraped footers against the locally computed statistics
+    footers = {summary.module: summary.footer for summary in summary_data}
+    for summary in local_summaries:
+        summary.footer = footers.get(summary.module, {})
+        for mismatch in check_against_footer(summary):
+            print(f"⚠️ {summary.module} footer mismatch - {mismatch}")
+    save_to_excel(local_summaries, filename)
+
 if __name__ == "__main__":
-    run_summary_scraper()
\ No newline at end of file
+    # Usage: python module_summary_scraper.py [YEAR] [SEMESTER] [--scrape]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    run_summary_scraper(args[0] if len(args) > 0 else DEFAULT_YEAR,
+                        args[1] if len(args) > 1 else DEFAULT_SEMESTER,
+                        scrape="--scrape" in sys.argv)
\ No newline at end of file
@@ -0,0 +1,128 @@
+import time
+
+from module_index import INDEX_DIR, save_module_index
+
+
+# Page markers MMS shows instead of a grades table or chart
+NO_DATA_MARKERS = [
+    "no students",
+    "no results",
+    "no data",
+    "there are no",
+    "not found",
+    "does not exist",
+    "do not have permission",
+    "not running",
+]
+
+PRESENT = "present"
+ABSENT = "absent"
+LOGIN = "login"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+# Recorded "absent" results are trusted for this long before the page is probed again
+PROBE_TTL_DAYS = 14
+
+# Races the wanted element against the "no data" markers inside the browser,
+# so an absent page is detected as soon as it has loaded instead of after a
+# full WebDriverWait timeout. Markers are only looked for inside the scope
+# element (e.g. the chart container), never in navigation or help text.
+PROBE_SCRIPT = """
+var selector = arguments[0], scope = arguments[1], markers = arguments[2], timeout = arguments[3];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+(function check() {
+    if (document.querySelector(selector)) { return done('present'); }
+    var container = scope ? document.querySelector(scope) : null;
+    var text = container ? container.innerText.toLowerCase() : '';
+    for (var i = 0; i < markers.length; i++) {
+        if (text && text.indexOf(markers[i]) !== -1) { return done('absent'); }
+    }
+    if (document.readyState === 'complete' && Date.now() - start >= timeout) {
+        return done('timeout');
+    }
+    setTimeout(check, 50);
+})();
+"""
+
+
+def is_login_url(url):
+    """Check whether a URL is the St Andrews login page"""
+    url = url.lower()
+    return "login" in url or "auth" in url
+
+
+def is_login_page(driver):
+    """Check whether the browser has been redirected to the login page"""
+    return is_login_url(driver.current_url)
+
+
+def probe_page(driver, url, selector, scope=None, timeout=0.8):
+    """Load a page and report whether the selector is present, absent or behind a login redirect.
+
+    ABSENT is only reported for a "no data" marker inside the scope element; without a
+    scope the probe never reports ABSENT. TIMEOUT means neither showed up in time and
+    ERROR that the probe itself failed; callers should fall back to a normal wait for both.
+    """
+    driver.get(url)
+    if is_login_page(driver):
+        return LOGIN
+
+    driver.set_script_timeout(timeout + 2)
+    try:
+        return driver.execute_async_script(PROBE_SCRIPT, selector, scope, NO_DATA_MARKERS, int(timeout * 1000))
+    except Exception as e:
+        print(f"    Probe failed for {url}: {e}")
+        return ERROR
+
+
+def probe_status(index, module_code, page, ttl_days=PROBE_TTL_DAYS):
+    """Recorded probe result for a module page, or None if it has not been probed or has expired"""
+    if not index:
+        return None
+    entry = index["modules"].get(module_code, {})
+    probe = entry.get("probes", {}).get(page)
+    if not isinstance(probe, dict):
+        return None  # Results recorded without a timestamp are probed again
+    if time.time() - probe.get("probed_at", 0) > ttl_days * 86400:
+        return None
+    return probe.get("status")
+
+
+def is_known_absent(index, module_code, page):
+    """True when a recent run found the page has no data"""
+    return probe_status(index, module_code, page) == ABSENT
+
+
+def record_probe(index, module_code, page, status):
+    """Store a probe result in the module index (only present/absent results are recorded)"""
+    if not index or status not in (PRESENT, ABSENT) or module_code not in index["modules"]:
+        return
+    entry = index["modules"][module_code]
+    entry.setdefault("probes", {})[page] = {"status": status, "probed_at": int(time.time())}
+
+
+def clear_probes(index):
+    """Forget every recorded probe result so all pages are probed again"""
+    if not index:
+        return
+    for entry in index["modules"].values():
+        entry.pop("probes", None)
+
+
+def merge_probes(index, other, module_codes):
+    """Copy the recorded probe results of the given modules from another index (e.g. a shard's)"""
+    if not index or not other:
+        return
+    for module_code in module_codes:
+        other_entry = other["modules"].get(module_code, {})
+        if other_entry.get("probes"):
+            entry = index["modules"].setdefault(module_code, {"pages": list(other_entry.get("pages", []))})
+            entry.setdefault("probes", {}).update(other_entry["probes"])
+
+
+def save_probes(index, index_dir=INDEX_DIR):
+    """Persist recorded probe results with the module index"""
+    if index:
+        save_module_index(index, index_dir)
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+
+
+HISTORY_PATH = os.path.join("cache", "run_history.jsonl")
+
+
+def format_duration(seconds):
+    """Format seconds as e.g. 1h05m, 4m10s or 12s"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class RunProgress:
+    """Per-module and per-stage timing for a run, with a rolling (EWMA) throughput and ETA"""
+
+    # Throughput after this many modules is the baseline later slowdowns are compared with
+    BASELINE_MODULES = 3
+
+    def __init__(self, total, alpha=0.3, history_path=HISTORY_PATH):
+        self.total = total
+        self.alpha = alpha
+        self.history_path = history_path
+        self.started_at = time.time()
+        self.completed = set()
+        self.skipped = 0
+        self.module_ewma = None
+        self.baseline_module_ewma = None
+        self.stage_ewma = {}
+        self._module = None
+        self._module_start = None
+        self._module_stages = {}
+
+    @property
+    def done(self):
+        """Distinct modules completed so far"""
+        return len(self.completed)
+
+    def _smooth(self, previous, value):
+        return value if previous is None else self.alpha * value + (1 - self.alpha) * previous
+
+    def modules_per_minute(self):
+        """Current throughput from the smoothed time per module"""
+        return 60 / self.module_ewma if self.module_ewma else None
+
+    def eta_seconds(self):
+        """Estimated time left for the remaining modules"""
+        if self.module_ewma is None:
+            return None
+        return max(self.total - self.done - self.skipped, 0) * self.module_ewma
+
+    def status(self):
+        """Short ETA / throughput text for progress lines"""
+        if self.module_ewma is None:
+            return "ETA after first module"
+        return f"ETA {format_duration(self.eta_seconds())}, {self.modules_per_minute():.1f} modules/min"
+
+    def start_module(self, module_code):
+        """Finish the previous module (if any) and start timing the next one"""
+        self.finish_module()
+        self._module = module_code
+        self._module_start = time.perf_counter()
+        self._module_stages = {}
+        print(f"\n[{self.done + self.skipped + 1}/{self.total}] Processing module {module_code}... ({self.status()})")
+
+    def finish_module(self):
+        """Record the module being timed, if any"""
+        if self._module is None:
+            return
+        elapsed = time.perf_counter() - self._module_start
+        self.completed.add(self._module)
+        self.module_ewma = self._smooth(self.module_ewma, elapsed)
+        if self.baseline_module_ewma is None and self.done == self.BASELINE_MODULES:
+            self.baseline_module_ewma = self.module_ewma
+
+        stages = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self._module_stages.items())
+        print(f"  ⏱️ {self._module} took {elapsed:.1f}s" + (f" ({stages})" if stages else ""))
+        if self.baseline_module_ewma and self.module_ewma > 1.5 * self.baseline_module_ewma:
+            print(f"  🐢 Throughput down to {self.modules_per_minute():.1f} modules/min "
+                  f"from {60 / self.baseline_module_ewma:.1f} at the start of the run")
+        self._module = None
+
+    def skip_module(self):
+        """Drop the module being timed without recording it (e.g. parked after a session expiry)"""
+        if self._module is not None:
+            self.skipped += 1
+            self._module = None
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the current module (or of the run, outside a module)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._module_stages[name] = self._module_stages.get(name, 0) + elapsed
+            self.stage_ewma[name] = self._smooth(self.stage_ewma.get(name), elapsed)
+
+    def write_history(self, **details):
+        """Append this run's throughput record to the local history file"""
+        self.finish_module()
+        elapsed = time.time() - self.started_at
+        record = {
+            "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "modules": self.done,
+            "elapsed_seconds": round(elapsed, 1),
+            "seconds_per_module": round(elapsed / self.done, 2) if self.done else None,
+            "modules_per_minute": round(self.done / elapsed * 60, 2) if elapsed > 0 else None,
+            "stage_seconds_ewma": {name: round(seconds, 2) for name, seconds in self.stage_ewma.items()},
+            **details,
+        }
+        os.makedirs(os.path.dirname(self.history_path) or ".", exist_ok=True)
+        with open(self.history_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"⏱️ Run took {format_duration(elapsed)} "
+              f"({record['modules_per_minute']} modules/min), logged to {self.history_path}")
+        return record
+
+
+def load_history(history_path=HISTORY_PATH):
+    """All recorded runs, oldest first"""
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    # Compare recorded runs across semesters
+    runs = load_history()
+    if not runs:
+        print("No runs recorded yet.")
+    for run in runs:
+        stages = ", ".join(f"{name} {seconds}s" for name, seconds in run["stage_seconds_ewma"].items())
+        print(f"{run['finished_at']}  {run.get('year', '?')} {run.get('semester', '?')}  "
+              f"{run['modules']:>4} modules  {format_duration(run['elapsed_seconds']):>7}  "
+              f"{run['modules_per_minute']} modules/min  [{stages}]")
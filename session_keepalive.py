@@ -0,0 +1,123 @@
+import os
+import re
+import json
+import time
+import threading
+import requests
+
+from module_index import MODULE_LISTING_URL
+from page_probe import is_login_url, is_login_page
+
+
+PARKED_DIR = "cache"
+
+# Names of the MMS (Java servlet) and SSO session cookies; other cookies do not end the login
+SESSION_COOKIE_RE = re.compile(r"jsessionid|session|sso|shib|saml|casauth|tgc", re.IGNORECASE)
+
+
+class SessionExpired(Exception):
+    """Raised when MMS redirects to the login page in the middle of a run"""
+
+
+def is_session_cookie(cookie):
+    """Whether a cookie is the MMS or St Andrews SSO login session (not analytics or preferences)"""
+    domain = cookie.get("domain", "").lower()
+    return domain.endswith("st-andrews.ac.uk") and bool(SESSION_COOKIE_RE.search(cookie["name"]))
+
+
+def cookie_expiry(cookies):
+    """Earliest expiry (epoch seconds) of the login session cookies, or None if they have no fixed lifetime"""
+    expiries = [cookie["expiry"] for cookie in cookies if cookie.get("expiry") and is_session_cookie(cookie)]
+    return min(expiries) if expiries else None
+
+
+class SessionHeartbeat(threading.Thread):
+    """Keep the MMS session warm by touching a lightweight authenticated page on a timer.
+
+    The heartbeat uses its own HTTP session with cookies copied from the browser, so it
+    never touches the WebDriver from a background thread. Call sync_cookies() from the
+    main thread after (re-)authenticating.
+    """
+
+    def __init__(self, driver, url=MODULE_LISTING_URL, interval=240):
+        super().__init__(daemon=True)
+        self.url = url
+        self.interval = interval
+        self.http = requests.Session()
+        self.expired = False
+        self.expires_at = None
+        self.last_beat = None
+        self._stop_event = threading.Event()
+        self.sync_cookies(driver)
+
+    def sync_cookies(self, driver):
+        """Copy the browser's cookies into the heartbeat session"""
+        cookies = driver.get_cookies()
+        self.http.cookies.clear()
+        for cookie in cookies:
+            self.http.cookies.set(cookie["name"], cookie["value"],
+                                  domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        self.expires_at = cookie_expiry(cookies)
+        self.expired = False
+
+    def seconds_until_expiry(self):
+        """Predicted seconds until the session cookies lapse, or None if they have no fixed lifetime"""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.time()
+
+    def beat(self):
+        """Touch the keep-alive page once and record whether the session is still valid"""
+        try:
+            response = self.http.get(self.url, timeout=15)
+        except requests.RequestException as e:
+            print(f"  💓 Heartbeat failed: {e}")
+            return
+        self.last_beat = time.time()
+        if response.status_code in (401, 403) or is_login_url(response.url):
+            if not self.expired:
+                print("  💔 Heartbeat: MMS session has expired")
+            self.expired = True
+
+    def confirm_expired(self, driver):
+        """Check a suspected expiry in the browser (main thread only); resyncs and returns False if still logged in"""
+        driver.get(self.url)
+        if is_login_page(driver):
+            return True
+        print("  💓 Browser session is still valid, heartbeat cookies refreshed")
+        self.sync_cookies(driver)
+        return False
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.beat()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def parked_path(year, semester, directory=PARKED_DIR):
+    """File listing the modules parked by the last run of a year and semester"""
+    return os.path.join(directory, f"parked_modules_{year}_{semester}.json")
+
+
+def save_parked(module_codes, year, semester, directory=PARKED_DIR):
+    """Record parked modules for a later --resume run (removes the file when nothing is parked)"""
+    path = parked_path(year, semester, directory)
+    if not module_codes:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sorted(module_codes), f, indent=2)
+    return path
+
+
+def load_parked(year, semester, directory=PARKED_DIR):
+    """Modules parked by the last run, or an empty list"""
+    path = parked_path(year, semester, directory)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import pandas as pd
+
+from module_index import DEFAULT_YEAR, DEFAULT_SEMESTER, load_module_index, save_module_index
+from page_probe import merge_probes
+from grade_snapshots import save_snapshot, load_snapshot, snapshot_to_grades, load_footers
+
+
+SHARD_ROOT = "shards"
+MANIFEST_FILE = "manifest.json"
+SUMMARY_FILE = "summary.csv"
+
+
+def parse_shard(text):
+    """Parse a shard given as "I/N" (1-based) into (I, N)"""
+    shard, shards = (int(part) for part in text.split("/"))
+    if not 1 <= shard <= shards:
+        raise ValueError(f"Shard must be between 1 and {shards}, got {shard}")
+    return shard, shards
+
+
+def shard_of(module_code, shards):
+    """Shard (1-based) a module belongs to; stable across processes and machines"""
+    digest = hashlib.md5(module_code.encode("utf-8")).hexdigest()
+    return int(digest, 16) % shards + 1
+
+
+def shard_modules(module_codes, shard, shards):
+    """Modules of the plan assigned to one shard"""
+    return [code for code in module_codes if shard_of(code, shards) == shard]
+
+
+def shard_dir(shard, shards, root=SHARD_ROOT):
+    """Folder holding one shard's partial output"""
+    return os.path.join(root, f"shard_{shard}_of_{shards}")
+
+
+def write_shard_output(shard, shards, summary_df, module_codes, year=DEFAULT_YEAR,
+                       semester=DEFAULT_SEMESTER, root=SHARD_ROOT):
+    """Store the summary and a manifest next to the shard's grades snapshot and charts"""
+    output_dir = shard_dir(shard, shards, root)
+    os.makedirs(output_dir, exist_ok=True)
+    summary_df.to_csv(os.path.join(output_dir, SUMMARY_FILE))
+    manifest = {"shard": shard, "shards": shards, "year": year, "semester": semester,
+                "modules": sorted(module_codes)}
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"🧩 Shard output written to {output_dir}")
+
+
+def load_manifests(root=SHARD_ROOT):
+    """Manifests of all finished shards under root, keyed by shard folder"""
+    manifests = {}
+    if not os.path.isdir(root):
+        return manifests
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                manifests[os.path.join(root, name)] = json.load(f)
+    return manifests
+
+
+def merge_shards(root=SHARD_ROOT, output_filename="Complete_Modules_Data_and_Charts.xlsx"):
+    """Assemble the final workbook and summary from all shard outputs, in module code order.
+
+    Only the charts of each shard's own modules are embedded (never leftovers in charts/), and
+    the probe results the shards recorded are merged into the shared module index.
+    """
+    from ModuleGradesChartsExtractor import build_workbook
+
+    manifests = load_manifests(root)
+    if not manifests:
+        print(f"❌ No finished shards found in {root}/")
+        return False
+
+    runs = {(m["shards"], m["year"], m["semester"]) for m in manifests.values()}
+    if len(runs) > 1:
+        print(f"❌ Shards from different runs found in {root}/: {sorted(runs)}")
+        return False
+    shards, year, semester = runs.pop()
+    missing = sorted(set(range(1, shards + 1)) - {m["shard"] for m in manifests.values()})
+    if missing:
+        print(f"⚠️ Missing shards {missing} of {shards}, merging the rest")
+
+    with tempfile.TemporaryDirectory(prefix="merged_charts_") as charts_dir:
+        snapshots, summaries, footers = [], [], {}
+        index = load_module_index(year, semester)
+        for folder, manifest in manifests.items():
+            snapshot = load_snapshot(year, semester, folder)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+            footers.update(load_footers(year, semester, folder))
+            summary_path = os.path.join(folder, SUMMARY_FILE)
+            if os.path.exists(summary_path) and os.path.getsize(summary_path) > 1:
+                summaries.append(pd.read_csv(summary_path, index_col='Module'))
+
+            # Each shard contributes the charts and probe results of its own modules only
+            for module_code in manifest["modules"]:
+                module_charts = os.path.join(folder, "charts", module_code)
+                if os.path.isdir(module_charts):
+                    shutil.copytree(module_charts, os.path.join(charts_dir, module_code))
+            shard_index = load_module_index(year, semester, folder)
+            if index is None:
+                index = shard_index
+            else:
+                merge_probes(index, shard_index, manifest["modules"])
+
+        if not snapshots:
+            print("❌ No grades found in the shard outputs")
+            return False
+        if index is not None:
+            print(f"🗂️ Probe results merged into {save_module_index(index)}")
+
+        # Sort by module code so the result does not depend on shard count or finishing order
+        merged = pd.concat(snapshots, ignore_index=True).sort_values('Module', kind='stable')
+        all_grades = dict(sorted(snapshot_to_grades(merged).items()))
+        summary_df = pd.concat(summaries).sort_index() if summaries else pd.DataFrame()
+
+        snapshot_file = save_snapshot(all_grades, year, semester, footers=footers)
+        print(f"💾 Merged grade snapshot saved: {snapshot_file}")
+        charts_added = build_workbook(all_grades, summary_df, output_filename, charts_dir)
+
+    print(f"\n✓ Merged {len(manifests)} shards ({len(all_grades)} modules, "
+          f"{charts_added} with charts) into {output_filename}")
+    return True
+
+
+if __name__ == "__main__":
+    # Usage: python shard_runs.py plan N          show which modules each of N shards runs
+    #        python shard_runs.py merge [ROOT]    merge finished shards into the final workbook
+    if len(sys.argv) > 2 and sys.argv[1] == "plan":
+        from module_index import load_module_index, plan_modules
+        shards = int(sys.argv[2])
+        codes = plan_modules(load_module_index())
+        for shard in range(1, shards + 1):
+            assigned = shard_modules(codes, shard, shards)
+            print(f"Shard {shard}/{shards} ({len(assigned)} modules): {', '.join(assigned)}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "merge":
+        merge_shards(sys.argv[2] if len(sys.argv) > 2 else SHARD_ROOT)
+    else:
+        print("Usage: python shard_runs.py plan N | merge [ROOT]")
@@ -0,0 +1,98 @@
+import os
+import sys
+import pandas as pd
+
+from grade_snapshots import grades_to_snapshot
+
+
+STUDENT_INDEX_PATH = os.path.join("cache", "student_index.pkl")
+PASS_GRADE = 7.0
+
+
+def build_student_index(all_grades):
+    """Index every (module, calc grade) pair by matric number, sorted for fast lookups"""
+    index = grades_to_snapshot(all_grades)
+    index['Matric Number'] = index['Matric Number'].astype(str)
+    index['Module'] = index['Module'].astype('category')
+    index['Calc Grade'] = pd.to_numeric(index['Calc Grade'], errors='coerce')
+    return index.set_index('Matric Number').sort_index()
+
+
+def save_student_index(index, path=STUDENT_INDEX_PATH):
+    """Store the index on disk in a compact form that loads instantly"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    index.to_pickle(path)
+    return path
+
+
+def load_student_index(path=STUDENT_INDEX_PATH):
+    """Load a stored student index, or return None if there is none yet"""
+    if not os.path.exists(path):
+        return None
+    return pd.read_pickle(path)
+
+
+def modules_for_student(index, matric_number):
+    """All modules and grades for one student"""
+    matric_number = str(matric_number)
+    if matric_number not in index.index:
+        return index.iloc[0:0]
+    return index.loc[[matric_number]]
+
+
+def _below_mask(index, threshold, count_missing):
+    """Rows with a grade below the threshold; missing (non-numeric, e.g. AB) grades count when count_missing"""
+    below = index['Calc Grade'] < threshold
+    return below | index['Calc Grade'].isna() if count_missing else below
+
+
+def students_below_threshold(index, threshold=PASS_GRADE, min_modules=2, count_missing=True):
+    """Students with a grade below the threshold in at least min_modules modules.
+
+    Non-numeric results such as AB are stored as missing grades and, like the exam board
+    does, count as below the threshold unless count_missing=False.
+    """
+    below = index[_below_mask(index, threshold, count_missing)]
+    grouped = below.groupby(level='Matric Number', observed=True)['Module']
+    result = pd.DataFrame({
+        'Modules below threshold': grouped.nunique(),
+        'Modules': grouped.agg(lambda modules: ", ".join(sorted(set(modules.astype(str))))),
+    })
+    result = result[result['Modules below threshold'] >= min_modules]
+    return result.sort_values('Modules below threshold', ascending=False, kind='stable')
+
+
+def student_sheet(index, threshold=PASS_GRADE, count_missing=True):
+    """One row per student with a column per module, for the Students sheet.
+
+    Every student with a result row is listed, even if none of their grades is numeric;
+    modules taken are counted by result rows, not by numeric grades.
+    """
+    rows = index.reset_index()
+    sheet = rows.groupby(['Matric Number', 'Module'], observed=True)['Calc Grade'].first().unstack('Module')
+    sheet.columns = sheet.columns.astype(str)
+    grouped = rows.groupby('Matric Number')['Module']
+    below = rows[_below_mask(rows, threshold, count_missing)].groupby('Matric Number')['Module'].nunique()
+    sheet.insert(0, f'Modules below {threshold:g}', below.reindex(sheet.index, fill_value=0))
+    sheet.insert(0, 'Modules taken', grouped.nunique().reindex(sheet.index))
+    return sheet
+
+
+if __name__ == "__main__":
+    # Usage: python student_index.py MATRIC_NUMBER
+    #        python student_index.py --below [THRESHOLD] [MIN_MODULES] [--numeric-only]
+    index = load_student_index()
+    if index is None:
+        print("❌ No student index found. Run ModuleGradesChartsExtractor.py first.")
+        sys.exit(1)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--below":
+        args = [arg for arg in sys.argv[2:] if not arg.startswith("--")]
+        threshold = float(args[0]) if len(args) > 0 else PASS_GRADE
+        min_modules = int(args[1]) if len(args) > 1 else 2
+        print(students_below_threshold(index, threshold, min_modules,
+                                       count_missing="--numeric-only" not in sys.argv).to_string())
+    elif len(sys.argv) > 1:
+        print(modules_for_student(index, sys.argv[1]).to_string())
+    else:
+        print(f"{index.index.nunique()} students, {index['Module'].nunique()} modules in index")
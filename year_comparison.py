@@ -0,0 +1,92 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+from module_index import DEFAULT_SEMESTER
+from grade_snapshots import load_snapshot
+from grade_summary import FOOTER_LABELS, GRADE_BANDS, STAT_DECIMALS
+
+
+def module_statistics(snapshot):
+    """Count, mean, std and band percentages for every module, as on the Summary sheet"""
+    graded = snapshot.dropna(subset=['Calc Grade'])
+    grades = graded['Calc Grade']
+
+    flags = pd.DataFrame({label: rule(grades) for label, rule in GRADE_BANDS.values()})
+    flags['Module'] = graded['Module'].values
+
+    stats = graded.groupby('Module')['Calc Grade'].agg(['count', 'mean', 'std'])
+    stats.columns = [FOOTER_LABELS[name] for name in stats.columns]
+    bands = flags.groupby('Module').mean() * 100
+    return stats.join(bands).round(STAT_DECIMALS)
+
+
+def ks_statistics(current, previous):
+    """Two-sample Kolmogorov–Smirnov statistic per module, computed for all modules at once"""
+    current = current.dropna(subset=['Calc Grade'])
+    previous = previous.dropna(subset=['Calc Grade'])
+
+    # Empirical CDFs of every module evaluated on the union of observed grades
+    current_counts = pd.crosstab(current['Module'], current['Calc Grade'])
+    previous_counts = pd.crosstab(previous['Module'], previous['Calc Grade'])
+    modules = current_counts.index.intersection(previous_counts.index)
+    grid = current_counts.columns.union(previous_counts.columns)
+
+    def ecdf(counts):
+        counts = counts.reindex(index=modules, columns=grid, fill_value=0).to_numpy(dtype=float)
+        return np.cumsum(counts, axis=1) / counts.sum(axis=1, keepdims=True)
+
+    distance = np.abs(ecdf(current_counts) - ecdf(previous_counts)).max(axis=1)
+    return pd.Series(distance, index=modules, name='KS statistic')
+
+
+def compare_years(current, previous, current_label, previous_label):
+    """Per-module changes between two grade snapshots"""
+    current_stats = module_statistics(current)
+    previous_stats = module_statistics(previous)
+
+    comparison = current_stats.join(previous_stats, how='outer',
+                                    lsuffix=f' {current_label}', rsuffix=f' {previous_label}')
+    for column in current_stats.columns:
+        comparison[f'Δ {column}'] = (comparison[f'{column} {current_label}']
+                                     - comparison[f'{column} {previous_label}'])
+
+    comparison = comparison.join(ks_statistics(current, previous))
+    comparison.index.name = 'Module'
+    return comparison.round(3)
+
+
+def write_comparison_sheet(comparison, filename, sheet_name="Year Comparison"):
+    """Write the comparison to its own sheet, adding it to the workbook if it already exists"""
+    if os.path.exists(filename):
+        with pd.ExcelWriter(filename, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
+            comparison.to_excel(writer, sheet_name=sheet_name)
+    else:
+        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+            comparison.to_excel(writer, sheet_name=sheet_name)
+    print(f"✓ Comparison saved to sheet '{sheet_name}' in {filename}")
+
+
+def run_comparison(current_year, previous_year, semester=DEFAULT_SEMESTER,
+                   output_filename="Year_Comparison.xlsx"):
+    """Compare two stored years without re-scraping either of them"""
+    current = load_snapshot(current_year, semester)
+    previous = load_snapshot(previous_year, semester)
+    for year, snapshot in [(current_year, current), (previous_year, previous)]:
+        if snapshot is None:
+            print(f"❌ No grade snapshot for {year} {semester}. Run the extractor for that year first.")
+            return None
+
+    comparison = compare_years(current, previous, current_year, previous_year)
+    write_comparison_sheet(comparison, output_filename)
+    return comparison
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python year_comparison.py CURRENT_YEAR PREVIOUS_YEAR [SEMESTER]")
+        print("Example: python year_comparison.py 2024_5 2023_4 S2")
+        sys.exit(1)
+    semester = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_SEMESTER
+    run_comparison(sys.argv[1], sys.argv[2], semester)